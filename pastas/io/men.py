@@ -54,8 +54,7 @@ def dump(fname, data, version=3, verbose=True):
                        'datlog_serial']:
             Hdict[field] = ''
         elif field == 'values':
-            date = array(
-                [datetime2matlab(x) for x in data['oseries']['series'].index])
+            date = datetime2matlab(data['oseries']['series'].index)
             vals = data['oseries']['series'].values
             Hdict[field] = [vstack((date, vals)).transpose()]
         elif field == 'filtnr':
@@ -148,8 +147,7 @@ def dump(fname, data, version=3, verbose=True):
                 elif field in ['LoggerSerial', 'datlog_serial']:
                     INdict[field] = ''
                 elif field == 'values':
-                    date = array(
-                        [datetime2matlab(x) for x in stress['series'].index])
+                    date = datetime2matlab(stress['series'].index)
                     vals = stress['series'].values
                     INdict[field] = [vstack((date, vals)).transpose()]
                 elif field == 'filtnr':
@@ -144,7 +144,7 @@ class MenyData:
                 if name != 'values':
                     data[name] = getattr(IN, name)
                 else:
-                    tindex = map(datenum_to_datetime, IN.values[:, 0])
+                    tindex = datenum_to_datetime(IN.values[:, 0])
                     series = Series(IN.values[:, 1], index=tindex)
 
                     # round on seconds, to get rid of conversion milliseconds
@@ -194,7 +194,7 @@ class MenyData:
                         # when diver-files are used, values will be empty
                         series = Series()
                     else:
-                        tindex = map(datenum_to_datetime, H.values[:, 0])
+                        tindex = datenum_to_datetime(H.values[:, 0])
                         # measurement is used as is
                         series = Series(H.values[:, 1], index=tindex)
                         # round on seconds, to get rid of conversion milliseconds
@@ -227,7 +227,7 @@ class MenyData:
                 if name != 'values':
                     data[name] = getattr(M, name)
                 else:
-                    tindex = map(datenum_to_datetime, M.values[:, 0])
+                    tindex = datenum_to_datetime(M.values[:, 0])
                     # measurement is used as is
                     series = Series(M.values[:, 1], index=tindex)
                     # round on seconds, to get rid of conversion milliseconds
@@ -1,15 +1,51 @@
 import logging
 from datetime import datetime, timedelta
+from functools import lru_cache
 from logging import handlers
 
 import numpy as np
-from pandas import Series, to_datetime, Timedelta, Timestamp, date_range
+from pandas import Series, to_timedelta, Timedelta, Timestamp, date_range, \
+    DatetimeIndex
 from pandas.tseries.frequencies import to_offset
-from scipy import interpolate
 
 logger = logging.getLogger(__name__)
 
-
+# Name of the console handler, used by set_console_handler to find it again
+_CONSOLE_HANDLER_NAME = 'pastas_console'
+
+# Parsing frequency strings is relatively slow, and only a few are used
+_to_offset = lru_cache(maxsize=256)(to_offset)
+
+# Number of nanoseconds in a day, the unit of Timedelta.value
+_DAY_NS = 86400e9
+
+# Day zero of the (1900) excel date system
+_EXCEL_EPOCH = Timestamp('1899-12-30')
+
+# Matlab datenum of 1970-01-01, the epoch of numpy.datetime64
+_MATLAB_EPOCH = 719529
+
+# Approximate number of days in the non-equidistant pandas offset aliases
+_FREQ_DAYS = {
+    # year
+    'A': 365, 'Y': 365, 'AS': 365, 'YS': 365,
+    'BA': 365, 'BY': 365, 'BAS': 365, 'BYS': 365,
+    # quarter
+    'BQ': 90, 'BQS': 90, 'Q': 90, 'QS': 90,
+    # month
+    'BM': 30, 'BMS': 30, 'CBM': 30, 'CBMS': 30, 'M': 30, 'MS': 30,
+    # semi-month
+    'SM': 15, 'SMS': 15,
+    # week
+    'W': 7,
+    # day
+    'B': 1, 'C': 1,
+    # hour
+    'BH': 1 / 24, 'CBH': 1 / 24,
+}
+
+
+@lru_cache(maxsize=128)
 def frequency_is_supported(freq):
     """Method to determine if a frequency is supported for a Pastas model.
 
@@ -42,7 +78,7 @@ def frequency_is_supported(freq):
     TODO: Rename to get_frequency_string and change Returns-documentation
 
     """
-    offset = to_offset(freq)
+    offset = _to_offset(freq)
     if not hasattr(offset, 'delta'):
         msg = "Frequency {} not supported.".format(freq)
         logger.error(msg)
@@ -77,39 +113,21 @@ def _get_stress_dt(freq):
 
     """
     # Get the frequency string and multiplier
-    offset = to_offset(freq)
+    offset = _to_offset(freq)
     if hasattr(offset, 'delta'):
-        dt = offset.delta / Timedelta(1, "D")
+        dt = offset.delta.value / _DAY_NS
     else:
-        num = offset.n
-        freq = offset.name
-        if freq in ['A', 'Y', 'AS', 'YS', 'BA', 'BY', 'BAS', 'BYS']:
-            # year
-            dt = num * 365
-        elif freq in ['BQ', 'BQS', 'Q', 'QS']:
-            # quarter
-            dt = num * 90
-        elif freq in ['BM', 'BMS', 'CBM', 'CBMS', 'M', 'MS']:
-            # month
-            dt = num * 30
-        elif freq in ['SM', 'SMS']:
-            # semi-month
-            dt = num * 15
-        elif freq in ['W']:
-            # week
-            dt = num * 7
-        elif freq in ['B', 'C']:
-            # day
-            dt = num
-        elif freq in ['BH', 'CBH']:
-            # hour
-            dt = num * 1 / 24
-        else:
-            raise (ValueError('freq of {} not supported'.format(freq)))
+        # Strip the anchor from the name, e.g. 'W-SUN' becomes 'W'
+        name = offset.name.split("-")[0]
+        try:
+            dt = offset.n * _FREQ_DAYS[name]
+        except KeyError:
+            raise ValueError('freq of {} not supported'.format(freq))
 
     return dt
 
 
+@lru_cache(maxsize=256)
 def _get_dt(freq):
     """Internal method to obtain a timestep in DAYS from a frequency string.
 
@@ -124,7 +142,7 @@ def _get_dt(freq):
 
     """
     # Get the frequency string and multiplier
-    dt = to_offset(freq).delta / Timedelta(1, "D")
+    dt = _to_offset(freq).delta.value / _DAY_NS
     return dt
 
 
@@ -144,7 +162,22 @@ def _get_time_offset(t, freq):
         Timedelta with the offset for the timestamp t.
 
     """
-    return t - t.floor(freq)
+    if t.tz is not None:
+        # floor takes care of daylight saving time in the local time
+        return t - t.floor(freq)
+    return Timedelta(t.value % _get_freq_ns(freq))
+
+
+@lru_cache(maxsize=256)
+def _get_freq_ns(freq):
+    """Internal method to obtain a timestep in nanoseconds from a frequency
+    string.
+
+    """
+    offset = _to_offset(freq)
+    if not hasattr(offset, 'delta'):
+        raise ValueError('{} is a non-fixed frequency'.format(freq))
+    return offset.delta.value
 
 
 def get_sample(tindex, ref_tindex):
@@ -171,10 +204,13 @@ def get_sample(tindex, ref_tindex):
     if len(tindex) == 1:
         return tindex
     else:
-        f = interpolate.interp1d(tindex.asi8, np.arange(0, tindex.size),
-                                 kind='nearest', bounds_error=False,
-                                 fill_value='extrapolate')
-        ind = np.unique(f(ref_tindex.asi8).astype(int))
+        a = tindex.asi8
+        b = ref_tindex.asi8
+        # find the nearest of the two neighbouring indices in tindex
+        ind = np.clip(np.searchsorted(a, b), 1, len(a) - 1)
+        left = ind - 1
+        pick_left = (b - a[left]) <= (a[ind] - b)
+        ind = np.unique(np.where(pick_left, left, ind))
         return tindex[ind]
 
 
@@ -192,7 +228,8 @@ def timestep_weighted_resample(series0, tindex):
     bfill).
 
     Compared to the reample methods in Pandas, this method is more accurate for
-    non-equidistanct series. It is much slower however.
+    non-equidistanct series. Timesteps in the new tindex that do not overlap
+    with the original series get a NaN-value.
 
     Parameters
     ----------
@@ -208,32 +245,56 @@ def timestep_weighted_resample(series0, tindex):
 
     """
 
-    # determine some arrays for the input-series
-    t0e = np.array(series0.index)
-    dt0 = np.diff(t0e)
-    dt0 = np.hstack((dt0[0], dt0))
+    # determine some arrays for the input-series, with times in nanoseconds
+    t0e = series0.index.asi8
+    dt0 = np.empty(len(t0e), dtype=t0e.dtype)
+    np.subtract(t0e[1:], t0e[:-1], out=dt0[1:])
+    dt0[0] = dt0[1]
     t0s = t0e - dt0
-    v0 = series0.values
+    v0 = series0.values.astype(float)
 
     # determine some arrays for the output-series
-    t1e = np.array(tindex)
-    dt1 = np.diff(t1e)
-    dt1 = np.hstack((dt1[0], dt1))
+    t1e = tindex.asi8
+    dt1 = np.empty(len(t1e), dtype=t1e.dtype)
+    np.subtract(t1e[1:], t1e[:-1], out=dt1[1:])
+    dt1[0] = dt1[1]
     t1s = t1e - dt1
-    v1 = []
-    for t1si, t1ei in zip(t1s, t1e):
-        # determine which periods within the series are within the new tindex
-        mask = (t0e > t1si) & (t0s < t1ei)
-        if np.any(mask):
-            # cut by the timestep-edges
-            ts = t0s[mask]
-            te = t0e[mask]
-            ts[ts < t1si] = t1si
-            te[te > t1ei] = t1ei
-            # determine timestep
-            dt = (te - ts).astype(float)
-            # determine timestep-weighted value
-            v1.append(np.sum(dt * v0[mask]) / np.sum(dt))
+
+    # cumulative integrals over the edges of the periods of the input-series
+    dt = dt0.astype(float)
+    with np.errstate(over="ignore", invalid="ignore"):
+        v0dt = v0 * dt
+    # leave out non-finite values, they would spoil all later integrals
+    nonfinite = ~np.isfinite(v0dt)
+    w0 = np.where(nonfinite, 0.0, v0)
+    integral = np.concatenate(([0.0], np.cumsum(np.where(nonfinite, 0.0,
+                                                          v0dt))))
+    nans = np.concatenate(([0], np.cumsum(nonfinite)))
+
+    # determine which periods within the series are within the new tindex
+    lo = np.searchsorted(t0e, t1s, side="right")
+    hi = np.searchsorted(t0s, t1e, side="left")
+    mask = hi > lo
+    first = np.minimum(lo, len(t0e) - 1)
+    last = np.maximum(hi - 1, 0)
+
+    # cut by the timestep-edges, the periods of the input-series are adjacent
+    ts = np.maximum(t0s[first], t1s)
+    te = np.minimum(t0e[last], t1e)
+    left = (ts - t0s[first]).astype(float)
+    right = (t0e[last] - te).astype(float)
+    # sum the periods that overlap, minus the parts outside the timestep
+    total = integral[hi] - integral[lo] - w0[first] * left - w0[last] * right
+    dt = (te - ts).astype(float)
+
+    # determine timestep-weighted value
+    v1 = np.full(len(t1e), np.nan)
+    v1[mask] = total[mask] / dt[mask]
+    # timesteps with non-finite values get inf, -inf or NaN, like np.sum
+    with np.errstate(invalid="ignore"):
+        for i in np.flatnonzero(nans[hi] - nans[lo] > 0):
+            v1[i] = v0dt[lo[i]:hi[i]][nonfinite[lo[i]:hi[i]]].sum()
+
     # replace all values in the series
     series = Series(v1, index=tindex)
     return series
@@ -309,7 +370,7 @@ def excel2datetime(tindex, freq="D"):
     datetimes: pandas.datetimeindex
 
     """
-    datetimes = to_datetime('1899-12-30') + Timedelta(tindex, freq)
+    datetimes = _EXCEL_EPOCH + to_timedelta(tindex, freq)
     return datetimes
 
 
@@ -318,42 +379,74 @@ def datenum_to_datetime(datenum):
     Convert Matlab datenum into Python datetime.
     Parameters
     ----------
-    datenum: float
+    datenum: float or array_like
         date in datenum format
 
     Returns
     -------
     datetime :
-        Datetime object corresponding to datenum.
+        Datetime object corresponding to datenum, or a pandas.DatetimeIndex
+        when an array of datenums is provided.
     """
-    days = datenum % 1.
-    return datetime.fromordinal(int(datenum)) \
-           + timedelta(days=days) - timedelta(days=366)
+    if np.ndim(datenum) == 0:
+        days = datenum % 1.
+        return datetime.fromordinal(int(datenum)) \
+               + timedelta(days=days) - timedelta(days=366)
+    else:
+        datenum = np.asarray(datenum, dtype=float)
+        days = np.floor(datenum)
+        # microseconds within the day, like datetime.timedelta rounds them
+        us = np.round((datenum - days) * 86400e6).astype(np.int64)
+        days = (days - _MATLAB_EPOCH).astype(np.int64)
+        datetimes = days.astype("datetime64[D]") + us.astype("timedelta64[us]")
+        return DatetimeIndex(datetimes)
 
 
 def datetime2matlab(tindex):
-    mdn = tindex + Timedelta(days=366)
-    frac = (tindex - tindex.round("D")).seconds / (24.0 * 60.0 * 60.0)
-    return mdn.toordinal() + frac
+    """Convert Python datetime into Matlab datenum.
+
+    Parameters
+    ----------
+    tindex: pandas.Timestamp or pandas.DatetimeIndex
+        A single Timestamp, or an index with multiple Timestamps.
+
+    Returns
+    -------
+    datenum: float or numpy.ndarray
+        Datenum(s) corresponding to tindex, in whole seconds.
+
+    """
+    if np.ndim(tindex) == 0:
+        mdn = tindex + Timedelta(days=366)
+        frac = (tindex - tindex.round("D")).seconds / (24.0 * 60.0 * 60.0)
+        return mdn.toordinal() + frac
+    else:
+        tindex = DatetimeIndex(tindex)
+        if tindex.tz is not None:
+            # use the local time, like the scalar path does
+            tindex = tindex.tz_localize(None)
+        seconds = tindex.asi8 // 1000000000
+        days, seconds = np.divmod(seconds, 86400)
+        return days + _MATLAB_EPOCH + seconds / (24.0 * 60.0 * 60.0)
 
 
 def get_stress_tmin_tmax(ml):
     """Get the minimum and maximum time that all of the stresses have data"""
     from .model import Model
     from .project import Project
-    tmin = Timestamp.min
-    tmax = Timestamp.max
     if isinstance(ml, Model):
-        for sm in ml.stressmodels:
-            for st in ml.stressmodels[sm].stress:
-                tmin = max((tmin, st.series_original.index.min()))
-                tmax = min((tmax, st.series_original.index.max()))
+        stresses = [st for sm in ml.stressmodels.values() for st in sm.stress]
     elif isinstance(ml, Project):
-        for st in ml.stresses['series']:
-            tmin = max((tmin, st.series_original.index.min()))
-            tmax = min((tmax, st.series_original.index.max()))
+        stresses = ml.stresses['series']
     else:
         raise (TypeError('Unknown type {}'.format(type(ml))))
+    # collect the start and end of all stresses and reduce them at once
+    tmin = np.fromiter((st.series_original.index.min().value
+                        for st in stresses), dtype=np.int64)
+    tmax = np.fromiter((st.series_original.index.max().value
+                        for st in stresses), dtype=np.int64)
+    tmin = Timestamp(tmin.max(initial=Timestamp.min.value))
+    tmax = Timestamp(tmax.min(initial=Timestamp.max.value))
     return tmin, tmax
 
 
@@ -390,12 +483,16 @@ def set_console_handler(logger=None, level=logging.INFO,
     """
     if logger is None:
         logger = logging.getLogger('pastas')
-    remove_console_handler(logger)
-    ch = logging.StreamHandler()
+    for ch in logger.handlers:
+        if ch.name == _CONSOLE_HANDLER_NAME:
+            break
+    else:
+        ch = logging.StreamHandler()
+        ch.set_name(_CONSOLE_HANDLER_NAME)
+        logger.addHandler(ch)
     ch.setLevel(level)
     formatter = logging.Formatter(fmt=fmt)
     ch.setFormatter(formatter)
-    logger.addHandler(ch)
 
 
 def set_log_level(level):
@@ -419,8 +516,9 @@ def remove_console_handler(logger=None):
     """
     if logger is None:
         logger = logging.getLogger('pastas')
-    for handler in logger.handlers:
-        if isinstance(handler, logging.StreamHandler):
+    for handler in list(logger.handlers):
+        if isinstance(handler, logging.StreamHandler) and \
+                not isinstance(handler, logging.FileHandler):
             logger.removeHandler(handler)
 
 
@@ -0,0 +1,123 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pastas as ps
+
+
+def test_timestep_weighted_resample():
+    index = pd.date_range("2000-1-1 9:00", "2000-1-10 9:00")
+    series0 = pd.Series(np.arange(len(index), dtype=float), index)
+    tindex = series0.index.normalize()
+    series = ps.utils.timestep_weighted_resample(series0, tindex)
+    # each day at 0:00 is 9/24 covered by the previous value
+    expected = series0.values - 9 / 24
+    expected[0] = series0.values[0]
+    assert np.allclose(series.values, expected)
+
+
+def test_timestep_weighted_resample_no_overlap():
+    index = pd.date_range("2000-1-1", periods=10, freq="D")
+    series0 = pd.Series(1.0, index)
+    tindex = pd.date_range("2000-1-5", periods=20, freq="D")
+    series = ps.utils.timestep_weighted_resample(series0, tindex)
+    assert (series[:"2000-1-10"] == 1.0).all()
+    assert series["2000-1-11":].isna().all()
+
+
+def test_timestep_weighted_resample_inf():
+    index = pd.date_range("2000-1-1", periods=6, freq="D")
+    series0 = pd.Series([1.0, np.inf, 1.0, 1.0, 1.0, 1.0], index)
+    series = ps.utils.timestep_weighted_resample(series0, index)
+    assert np.array_equal(series.values, series0.values)
+    series0[1] = 1e300
+    series = ps.utils.timestep_weighted_resample(series0, index)
+    assert np.isinf(series[1])
+    assert (series.drop(index[1]) == 1.0).all()
+
+
+def test_get_stress_dt():
+    assert ps.utils._get_stress_dt("7D") == 7.0
+    assert ps.utils._get_stress_dt("2W") == 14
+    assert ps.utils._get_stress_dt("MS") == 30
+    assert ps.utils._get_stress_dt("A") == 365
+
+
+def test_datenum_to_datetime():
+    datenum = np.array([730486.0, 730486.75, 737791.5])
+    tindex = ps.utils.datenum_to_datetime(datenum)
+    for t, d in zip(tindex, datenum):
+        assert t == ps.utils.datenum_to_datetime(d)
+    assert np.allclose(ps.utils.datetime2matlab(tindex), datenum)
+    tindex = tindex.tz_localize("Europe/Amsterdam")
+    datenum_tz = [ps.utils.datetime2matlab(t) for t in tindex]
+    assert np.allclose(ps.utils.datetime2matlab(tindex), datenum_tz)
+    assert np.allclose(ps.utils.datetime2matlab(tindex), datenum)
+
+
+def test_set_log_level():
+    logger = logging.getLogger("pastas_test_set_log_level")
+    for level in ["DEBUG", "ERROR", "INFO"]:
+        ps.utils.set_console_handler(logger, level=level)
+    handlers = [h for h in logger.handlers
+                if isinstance(h, logging.StreamHandler)]
+    assert len(handlers) == 1
+    assert handlers[0].level == logging.INFO
+    ps.utils.remove_console_handler(logger)
+    assert not logger.handlers
+
+
+def test_console_handler_per_logger():
+    mine = logging.getLogger("pastas_test_mine")
+    ps.utils.set_console_handler(mine, level=logging.DEBUG,
+                                fmt="MINE %(message)s")
+    ps.set_log_level("ERROR")
+    handler = mine.handlers[0]
+    assert len(mine.handlers) == 1
+    assert handler.level == logging.DEBUG
+    assert handler.formatter._fmt == "MINE %(message)s"
+    assert handler not in logging.getLogger("pastas").handlers
+    ps.set_log_level("INFO")
+    ps.utils.remove_console_handler(mine)
+
+
+def test_get_time_offset():
+    t = pd.Timestamp("2000-01-01 09:30:15")
+    offset = ps.utils._get_time_offset(t, "D")
+    assert offset == pd.Timedelta("9H30min15S")
+    assert ps.utils._get_time_offset(t, "6H") == pd.Timedelta("3H30min15S")
+
+
+def test_get_time_offset_dst():
+    t = pd.Timestamp("2008-03-30 03:29:51", tz="Europe/Amsterdam")
+    offset = ps.utils._get_time_offset(t, "D")
+    assert t - offset == pd.Timestamp("2008-03-30", tz="Europe/Amsterdam")
+
+
+def test_get_time_offset_non_fixed_freq():
+    with pytest.raises(ValueError):
+        ps.utils._get_time_offset(pd.Timestamp("2000-01-01 09:00"), "W")
+
+
+def test_get_sample():
+    tindex = pd.date_range("2000-1-1", periods=10, freq="D")
+    # exactly between two samples, the left sample is taken
+    ref_tindex = pd.DatetimeIndex(["2000-1-2 12:00", "2000-1-5 13:00"])
+    sample = ps.utils.get_sample(tindex, ref_tindex)
+    assert sample.equals(pd.DatetimeIndex(["2000-1-2", "2000-1-6"]))
+
+
+def test_get_sample_outside_tindex():
+    tindex = pd.date_range("2000-1-1", periods=10, freq="D")
+    ref_tindex = pd.DatetimeIndex(["1999-12-1", "2000-2-1"])
+    sample = ps.utils.get_sample(tindex, ref_tindex)
+    assert sample.equals(tindex[[0, -1]])
+
+
+def test_get_sample_unique():
+    tindex = pd.date_range("2000-1-1", periods=10, freq="D")
+    ref_tindex = pd.date_range("2000-1-4 22:00", periods=5, freq="H")
+    sample = ps.utils.get_sample(tindex, ref_tindex)
+    assert sample.equals(pd.DatetimeIndex(["2000-1-5"]))